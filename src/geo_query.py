@@ -3,18 +3,71 @@
 提供点位等级查询和距离计算功能
 """
 
+import os
+import numpy as np
+import pandas as pd
+import shapely
 import geopandas as gpd
 from shapely.geometry import Point, box
-from shapely.ops import unary_union, nearest_points
 import math
-from concurrent.futures import ThreadPoolExecutor
-from pyproj import CRS
+import threading
+from functools import lru_cache
+from pyproj import CRS, Transformer
 from typing import Optional, Dict, List
 
-from .utils import load_wind_level_gdf, fix_invalid_geometry
+from .utils import (
+    load_wind_level_gdf, fix_invalid_geometry_array, get_property_records
+)
 
-# 全局缓存：避免重复加载 GeoJSON
-_GDF_CACHE = {}
+# 数据加载锁：每个文件一把锁，多线程并发查询时同一文件只加载一次，
+# 加载某个文件时不会阻塞其他文件的缓存命中；_GDF_LOCK 只保护 _PATH_LOCKS 本身
+_GDF_LOCK = threading.Lock()
+_PATH_LOCKS: Dict[str, threading.Lock] = {}
+
+
+def _boundary_rows(
+    lon: float,
+    lat: float,
+    geoms: np.ndarray,
+    sindex,
+    distance_threshold_m: float
+) -> np.ndarray:
+    """
+    查找与点距离小于阈值的多边形（用于点恰好在边界附近、未直接相交的情况）
+    
+    Args:
+        lon, lat: 查询点坐标
+        geoms: gdf 的几何对象数组
+        sindex: gdf 的空间索引
+        distance_threshold_m: 边界点判断阈值（米）
+    
+    Returns:
+        满足条件的 gdf 行号（升序）
+    """
+    pt = Point(lon, lat)
+    
+    # 只投影阈值范围内的多边形（经度方向按纬度余弦放大，留两倍余量）
+    # 远处的多边形投影后可能严重变形，不参与判断
+    margin_deg = 2 * distance_threshold_m / (110_000.0 * max(math.cos(math.radians(lat)), 1e-6))
+    nearby = np.sort(sindex.query(box(lon - margin_deg, lat - margin_deg,
+                                          lon + margin_deg, lat + margin_deg)))
+    nearby = nearby[shapely.dwithin(geoms[nearby], pt, margin_deg)]
+    if len(nearby) == 0:
+        return nearby
+    
+    # 使用投影计算精确距离
+    try:
+        polys_proj = fix_invalid_geometry_array(_project_to_aeqd(geoms[nearby], lon, lat))
+        pt_proj = _project_point_to_aeqd(lon, lat)
+        
+        # 计算每个候选多边形的距离（向量化）
+        dists = shapely.distance(polys_proj, pt_proj)
+    except Exception as e:
+        print(f"Warning: Projection failed in query_point_level: {e}")
+        return nearby[:0]
+    
+    # 距离小于阈值的多边形认为点在其边界上
+    return nearby[dists < distance_threshold_m]
 
 
 def query_point_level(lon: float, lat: float, gdf: gpd.GeoDataFrame, distance_threshold_m: float = 1.0) -> Dict:
@@ -36,77 +89,124 @@ def query_point_level(lon: float, lat: float, gdf: gpd.GeoDataFrame, distance_th
         }
     """
     pt = Point(lon, lat)
+    geoms = np.asarray(gdf.geometry.values)
     
-    # 找到包含该点的所有多边形（使用小缓冲区容错）
-    pt_buffer = pt.buffer(1e-9)  # 极小缓冲区，避免边界判断问题
-    containing = gdf[gdf.geometry.intersects(pt_buffer)]
+    # 空间索引按包围盒粗筛候选多边形，再用向量化的点在多边形内判断精筛
+    # 索引结果排序，保持与原数据相同的行顺序
+    # intersects_xy 包含边界上的点（不同时次的多边形会重叠，边界命中同样有效）
+    candidates = np.sort(gdf.sindex.query(pt))
+    hits = candidates[shapely.intersects_xy(geoms[candidates], lon, lat)]
     
     # 如果没有直接相交，尝试找距离为 0 的多边形（可能在边界上）
-    if len(containing) == 0:
-        # 使用投影计算精确距离
-        proj_str = f"+proj=aeqd +lat_0={lat} +lon_0={lon} +ellps=WGS84 +units=m +no_defs"
-        local_crs = CRS.from_proj4(proj_str)
-        
-        try:
-            gdf_proj = gdf.to_crs(local_crs)
-            gdf_proj['geometry'] = gdf_proj['geometry'].apply(fix_invalid_geometry)
-            pt_gdf = gpd.GeoDataFrame(geometry=[pt], crs="EPSG:4326")
-            pt_proj = pt_gdf.to_crs(local_crs).geometry.iloc[0]
-            
-            # 计算每个多边形的距离
-            gdf_proj['dist_to_point'] = gdf_proj.geometry.apply(lambda geom: pt_proj.distance(geom))
-            
-            # 找到距离小于阈值的多边形（认为在边界上）
-            near_zero = gdf_proj[gdf_proj['dist_to_point'] < distance_threshold_m]
-            if len(near_zero) > 0:
-                # 获取原始索引
-                containing = gdf.loc[near_zero.index]
-        except Exception as e:
-            print(f"Warning: Projection failed in query_point_level: {e}")
-    
-    if len(containing) == 0:
+    if len(hits) == 0:
+        hits = _boundary_rows(lon, lat, geoms, gdf.sindex, distance_threshold_m)
+    
+    if len(hits) == 0:
         return {
             "in_polygon": False,
             "level": None,
             "matched_info": None
         }
     
-    if len(containing) == 1:
-        row = containing.iloc[0]
-        level_val = row.get("level")
-        # 转换为 Python 原生类型
-        if hasattr(level_val, 'item'):
-            level_val = level_val.item()
-        return {
-            "in_polygon": True,
-            "level": int(level_val) if level_val is not None else None,
-            "matched_info": {
-                "level": int(level_val) if level_val is not None else None,
-                "properties": {k: (v.item() if hasattr(v, 'item') else v) 
-                               for k, v in row.drop("geometry").to_dict().items()}
-            }
-        }
-    
-    # 多个命中，选择最高等级（风浪等级越高表示风险越大）
-    containing = containing.copy()
-    # 按 level 降序排列，取最高等级
-    highest = containing.sort_values('level', ascending=False).iloc[0]
-    level_val = highest.get("level")
-    # 转换为 Python 原生类型
-    if hasattr(level_val, 'item'):
-        level_val = level_val.item()
+    # 多个命中时选择最高等级（风浪等级越高表示风险越大），argmax 取第一个最大值
+    row = hits[int(np.argmax(gdf['level'].to_numpy()[hits]))] if len(hits) > 1 else hits[0]
+    # 属性在加载时已转换为 Python 原生类型，复制一份避免调用方修改缓存
+    properties = dict(get_property_records(gdf)[row])
+    level_val = properties.get("level")
     
     return {
         "in_polygon": True,
         "level": int(level_val) if level_val is not None else None,
         "matched_info": {
             "level": int(level_val) if level_val is not None else None,
-            "properties": {k: (v.item() if hasattr(v, 'item') else v) 
-                           for k, v in highest.drop("geometry").to_dict().items()}
+            "properties": properties
         }
     }
 
 
+def query_points_level(
+    lons,
+    lats,
+    gdf: gpd.GeoDataFrame,
+    distance_threshold_m: float = 1.0
+) -> np.ndarray:
+    """
+    批量查询多个点所在的风浪等级
+    
+    一次空间索引查询得到所有 (点, 多边形) 候选对，精筛后用 NumPy 取每个点的最高等级；
+    未直接相交的点按 distance_threshold_m 做边界判断，与 query_point_level 一致
+    
+    Args:
+        lons: 经度序列 (0~360)
+        lats: 纬度序列
+        gdf: 风浪等级 GeoDataFrame
+        distance_threshold_m: 边界点判断阈值（米），默认 1.0
+        
+    Returns:
+        每个点的等级数组（int64），不在任何等级区域内的点为 -1
+    """
+    lons = np.asarray(lons, dtype=np.float64)
+    lats = np.asarray(lats, dtype=np.float64)
+    geoms = np.asarray(gdf.geometry.values)
+    level_values = gdf['level'].to_numpy()
+    
+    # 包围盒粗筛得到所有 (点, 多边形) 候选对，再一次向量化精筛（含边界上的点）
+    point_idx, poly_idx = gdf.sindex.query(shapely.points(lons, lats))
+    hit = shapely.intersects_xy(geoms[poly_idx], lons[point_idx], lats[point_idx])
+    # 缺失等级的多边形不算命中
+    hit &= ~pd.isna(level_values[poly_idx])
+    
+    levels_out = np.full(len(lons), -1, dtype=np.int64)
+    np.maximum.at(levels_out, point_idx[hit], level_values[poly_idx[hit]].astype(np.int64))
+    
+    # 未命中的点逐个做边界判断
+    sindex = gdf.sindex
+    for i in np.flatnonzero(levels_out < 0):
+        rows = _boundary_rows(lons[i], lats[i], geoms, sindex, distance_threshold_m)
+        rows = rows[~pd.isna(level_values[rows])]
+        if len(rows) > 0:
+            levels_out[i] = level_values[rows].max()
+    
+    return levels_out
+
+
+@lru_cache(maxsize=16)
+def _get_aeqd_transformer(lat: float, lon: float) -> Transformer:
+    """
+    获取 EPSG:4326 到以 (lon, lat) 为中心的方位等距投影（单位：米）的转换器
+    
+    转换器构建开销较大，按中心点缓存，同一查询点的多次计算（边界判断、逐轮扩大搜索范围）
+    共享同一个转换器。不同查询点几乎不会命中同一个键，每个转换器约占 50KB，只保留最近 16 个
+    """
+    proj_str = f"+proj=aeqd +lat_0={lat} +lon_0={lon} +ellps=WGS84 +units=m +no_defs"
+    return Transformer.from_crs("EPSG:4326", CRS.from_proj4(proj_str), always_xy=True)
+
+
+def _project_to_aeqd(geoms: np.ndarray, lon: float, lat: float) -> np.ndarray:
+    """
+    将 EPSG:4326 几何体数组投影到以 (lon, lat) 为中心的方位等距投影
+    
+    直接对坐标数组调用转换器，避免构造 GeoDataFrame 再 to_crs 的额外开销
+    """
+    transformer = _get_aeqd_transformer(lat, lon)
+    
+    def _transform(coords: np.ndarray) -> np.ndarray:
+        x, y = transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([x, y])
+    
+    return shapely.transform(geoms, _transform)
+
+
+def _project_point_to_aeqd(lon: float, lat: float) -> Point:
+    """
+    将查询点投影到以其自身为中心的方位等距投影
+    
+    单个点直接调用缓存的转换器并构造 Point，不经过几何数组
+    """
+    x, y = _get_aeqd_transformer(lat, lon).transform(lon, lat)
+    return Point(x, y)
+
+
 def _calculate_bearing(dx: float, dy: float) -> float:
     """
     根据投影坐标差值计算方位角
@@ -127,51 +227,52 @@ def _calculate_bearing(dx: float, dy: float) -> float:
     return angle_deg
 
 
-def _compute_single_level_distance(
-    level: int,
-    level_gdf: gpd.GeoDataFrame,
-    pt: Point,
-    local_crs: CRS,
-    radius_m: Optional[float],
-    decimal_places: int
-) -> Optional[Dict]:
-    """
-    计算单个等级的距离和方位角（用于并行计算）
+# 各等级距离搜索：未限制半径时从该范围开始，逐步扩大直到各等级的最近多边形都已确定
+_INITIAL_SEARCH_KM = 500.0
+
+# 地球半径取极半径（偏小），由距离换算出的角度偏大，搜索范围只会偏大
+_EARTH_RADIUS_MIN_KM = 6356.0
+
+# 裁剪多边形用的搜索矩形按此长度（度）加密边，避免矩形边界上的长边投影后变成弦
+_CLIP_SEGMENT_DEG = 0.5
+
+
+def _search_boxes(lon: float, lat: float, search_km: float) -> Optional[List]:
     """
-    if len(level_gdf) == 0:
-        return None
+    计算覆盖以 (lon, lat) 为中心、半径 search_km 的测地圆的经纬度矩形
     
-    try:
-        level_gdf_proj = level_gdf.to_crs(local_crs)
-        level_gdf_proj['geometry'] = level_gdf_proj['geometry'].apply(fix_invalid_geometry)
-        
-        pt_gdf = gpd.GeoDataFrame(geometry=[pt], crs="EPSG:4326")
-        pt_proj = pt_gdf.to_crs(local_crs).geometry.iloc[0]
-        
-        geom_union = unary_union(level_gdf_proj.geometry)
-        
-        dist_m = pt_proj.distance(geom_union)
-        
-        if radius_m is not None and dist_m > radius_m:
-            return None
-        
-        dist_km = dist_m / 1000.0
-        
-        bearing_deg = None
-        if dist_m > 1e-6:
-            p_query, p_near = nearest_points(pt_proj, geom_union)
-            dx = p_near.x - p_query.x
-            dy = p_near.y - p_query.y
-            bearing_deg = round(_calculate_bearing(dx, dy), decimal_places)
+    矩形跨越 0/360 度经线时拆成两个；距离大于 search_km 的多边形一定不与这些矩形相交
+    
+    Args:
+        lon: 经度 (0~360)
+        lat: 纬度
+        search_km: 搜索半径（千米）
         
-        return {
-            "level": int(level),
-            "distance_km": round(dist_km, decimal_places),
-            "bearing_deg": bearing_deg
-        }
-    except Exception as e:
-        print(f"Warning: Failed to project level {level}: {e}")
+    Returns:
+        shapely 矩形列表；搜索范围覆盖全球时返回 None
+    """
+    # 角距离（度），留 1% 余量覆盖椭球与球面的差异
+    d_deg = math.degrees(search_km / _EARTH_RADIUS_MIN_KM) * 1.01 + 0.01
+    if d_deg >= 180.0:
         return None
+    
+    min_lat, max_lat = max(lat - d_deg, -90.0), min(lat + d_deg, 90.0)
+    if max_lat >= 90.0 or min_lat <= -90.0:
+        # 测地圆包含极点，经度方向覆盖全部
+        return [box(0.0, min_lat, 360.0, max_lat)]
+    
+    sin_dlon = math.sin(math.radians(d_deg)) / math.cos(math.radians(lat))
+    if sin_dlon >= 1.0:
+        return [box(0.0, min_lat, 360.0, max_lat)]
+    dlon = math.degrees(math.asin(sin_dlon)) * 1.01 + 0.01
+    
+    min_lon, max_lon = lon - dlon, lon + dlon
+    boxes = [box(max(min_lon, 0.0), min_lat, min(max_lon, 360.0), max_lat)]
+    if min_lon < 0.0:
+        boxes.append(box(min_lon + 360.0, min_lat, 360.0, max_lat))
+    if max_lon > 360.0:
+        boxes.append(box(0.0, min_lat, max_lon - 360.0, max_lat))
+    return boxes
 
 
 def query_level_min_distance(
@@ -179,10 +280,15 @@ def query_level_min_distance(
     lat: float, 
     gdf: gpd.GeoDataFrame,
     radius_km: Optional[float] = None,
-    decimal_places: int = 3
+    decimal_places: int = 3,
+    known_contained_level: Optional[int] = None
 ) -> List[Dict]:
     """
-    计算给定点到各风浪等级区域的最近距离及方位角（并行计算）
+    计算给定点到各风浪等级区域的最近距离及方位角
+    
+    到某等级区域的距离即到该等级各多边形距离的最小值：用空间索引取出搜索范围内的多边形，
+    逐个投影到以查询点为中心的方位等距投影后计算距离，再按等级取最小值。
+    未设置半径时搜索范围从 _INITIAL_SEARCH_KM 开始逐步扩大，直到各等级的最近多边形都已确定
     
     Args:
         lon: 经度 (0~360)
@@ -190,6 +296,8 @@ def query_level_min_distance(
         gdf: 风浪等级 GeoDataFrame
         radius_km: 可选，最大搜索半径（千米），超出此范围的等级不返回
         decimal_places: 距离保留小数位数，默认 3
+        known_contained_level: 可选，已知点所在的等级（如 query_point_level 的结果），
+                               该等级直接记为 distance_km=0，不再投影和计算距离
         
     Returns:
         [
@@ -201,47 +309,120 @@ def query_level_min_distance(
                      0°=正北，90°=正东，180°=正南，270°=正西
                      若 distance_km=0（点在该等级区域内），则为 None
     """
-    pt = Point(lon, lat)
+    geoms = np.asarray(gdf.geometry.values)
+    level_values = gdf['level'].to_numpy()
+    # 缺失等级的多边形不参与距离计算
+    valid_rows = np.flatnonzero(~pd.isna(level_values))
+    unresolved = set(int(level) for level in np.unique(level_values[valid_rows]))
     
-    # 构造以查询点为中心的方位等距投影（单位：米）
-    proj_str = f"+proj=aeqd +lat_0={lat} +lon_0={lon} +ellps=WGS84 +units=m +no_defs"
-    local_crs = CRS.from_proj4(proj_str)
+    # 已知包含查询点的等级距离为 0，不参与投影和距离计算
+    contained = []
+    if known_contained_level is not None and known_contained_level in unresolved:
+        unresolved.remove(known_contained_level)
+        contained.append({
+            "level": int(known_contained_level),
+            "distance_km": 0.0,
+            "bearing_deg": None
+        })
+    
+    try:
+        pt_proj = _project_point_to_aeqd(lon, lat)
+    except Exception as e:
+        print(f"Warning: Failed to project query point: {e}")
+        return contained
+    
+    # 各等级当前找到的最近多边形：{level: (距离(米), 投影后的多边形)}
+    nearest = {}
+    search_km = radius_km if radius_km is not None else _INITIAL_SEARCH_KM
     
-    # 获取所有 level 值
-    levels = sorted(gdf['level'].dropna().unique())
+    while unresolved:
+        boxes = _search_boxes(lon, lat, search_km)
+        if boxes is None:
+            rows = valid_rows
+            parts = geoms[rows]
+        else:
+            # 每个 (矩形, 多边形) 候选对把多边形裁剪到矩形内，大多边形只投影查询点附近的部分。
+            # 裁剪新增的边都在矩形边界上（距离大于 search_km），与加密后的矩形求交，
+            # 这些边投影后不会变成靠近查询点的弦；多边形原有的边和顶点保持不变
+            box_idx, rows = gdf.sindex.query(np.array(boxes, dtype=object))
+            keep = np.isin(level_values[rows], list(unresolved))
+            box_idx, rows = box_idx[keep], rows[keep]
+            parts = np.empty(len(rows), dtype=object)
+            for i, rect in enumerate(boxes):
+                mask = box_idx == i
+                parts[mask] = shapely.intersection(geoms[rows[mask]], shapely.segmentize(rect, _CLIP_SEGMENT_DEG))
+        
+        if len(rows) > 0:
+            try:
+                polys_proj = fix_invalid_geometry_array(_project_to_aeqd(parts, lon, lat))
+            except Exception as e:
+                print(f"Warning: Failed to project level polygons: {e}")
+                return contained
+            # 裁剪后为空的多边形距离为 NaN，不参与比较
+            dists_m = np.nan_to_num(shapely.distance(polys_proj, pt_proj), nan=np.inf)
+            candidate_levels = level_values[rows]
+            
+            # 搜索范围只会扩大，本轮结果覆盖上一轮；已确定的等级不再参与
+            for level in unresolved:
+                mask = np.flatnonzero(candidate_levels == level)
+                if len(mask) == 0:
+                    continue
+                best = mask[np.argmin(dists_m[mask])]
+                if np.isfinite(dists_m[best]):
+                    nearest[level] = (float(dists_m[best]), polys_proj[best])
+        
+        # 搜索范围外的多边形距离都大于 search_km，最近距离不超过它的等级已确定
+        unresolved -= {level for level, (dist_m, _) in nearest.items() if dist_m <= search_km * 1000}
+        if radius_km is not None or boxes is None:
+            break
+        search_km *= 2
     
     radius_m = radius_km * 1000 if radius_km is not None else None
     
-    # 如果设置了半径，提前粗筛选（使用 bbox 过滤）
-    if radius_km is not None:
-        buffer_deg = (radius_km * 1.5) / 111.0
-        bbox_filter = box(lon - buffer_deg, lat - buffer_deg, 
-                         lon + buffer_deg, lat + buffer_deg)
-        gdf_filtered = gdf[gdf.intersects(bbox_filter)]
-    else:
-        gdf_filtered = gdf
-    
-    # 按等级分组
-    level_gdfs = {level: gdf_filtered[gdf_filtered['level'] == level].copy() 
-                  for level in levels}
-    
-    # 并行计算各等级
-    results = []
-    with ThreadPoolExecutor(max_workers=len(levels)) as executor:
-        futures = {
-            executor.submit(
-                _compute_single_level_distance,
-                level, level_gdfs[level], pt, local_crs, radius_m, decimal_places
-            ): level for level in levels
-        }
-        for future in futures:
-            result = future.result()
-            if result is not None:
-                results.append(result)
-    
-    # 按 level 排序
-    results.sort(key=lambda x: x['level'])
-    return results
+    results = contained
+    for level, (dist_m, poly_proj) in nearest.items():
+        if radius_m is not None and dist_m > radius_m:
+            continue
+        
+        bearing_deg = None
+        if dist_m > 1e-6:
+            (qx, qy), (nx, ny) = shapely.get_coordinates(shapely.shortest_line(pt_proj, poly_proj))
+            bearing_deg = round(_calculate_bearing(nx - qx, ny - qy), decimal_places)
+        
+        results.append({
+            "level": level,
+            "distance_km": round(dist_m / 1000.0, decimal_places),
+            "bearing_deg": bearing_deg
+        })
+    
+    return sorted(results, key=lambda item: item["level"])
+
+
+@lru_cache(maxsize=16)
+def _load_wind_level_gdf_cached(path: str, mtime: float) -> gpd.GeoDataFrame:
+    """
+    按 (绝对路径, 修改时间) 缓存加载结果，文件更新后自动失效，最多保留 16 份数据
+    """
+    return load_wind_level_gdf(path)
+
+
+def get_wind_level_gdf(geojson_path: str) -> gpd.GeoDataFrame:
+    """
+    获取风浪等级数据（首次加载后缓存，后续查询直接使用）
+    
+    Args:
+        geojson_path: 数据文件路径（.geojson 或 .parquet）
+        
+    Returns:
+        风浪等级 GeoDataFrame
+    """
+    path = os.path.abspath(geojson_path)
+    mtime = os.path.getmtime(path)
+    
+    with _GDF_LOCK:
+        path_lock = _PATH_LOCKS.setdefault(path, threading.Lock())
+    with path_lock:
+        return _load_wind_level_gdf_cached(path, mtime)
 
 
 def query_wind_level_info(
@@ -250,7 +431,8 @@ def query_wind_level_info(
     geojson_path: str,
     radius_km: Optional[float] = None,
     distance_threshold_m: float = 1.0,
-    decimal_places: int = 3
+    decimal_places: int = 3,
+    contained_level_only: bool = False
 ) -> Dict:
     """
     综合查询：返回点的风浪等级和到各等级的距离
@@ -258,10 +440,12 @@ def query_wind_level_info(
     Args:
         lon: 经度 (0~360)
         lat: 纬度
-        geojson_path: GeoJSON 文件路径
+        geojson_path: 数据文件路径（.geojson 或 .parquet）
         radius_km: 可选，最大搜索半径（千米）
         distance_threshold_m: 边界点判断阈值（米）
         decimal_places: 距离保留小数位数
+        contained_level_only: 为 True 且点在多边形内时，level_distances 只返回所在等级
+                              （distance_km=0），跳过到其他等级的距离计算
         
     Returns:
         {
@@ -277,17 +461,18 @@ def query_wind_level_info(
             ]  # bearing_deg: 方位角，0°=正北，顺时针增加；点在区域内时为None
         }
     """
-    # 使用缓存（首次加载后缓存，后续查询直接使用）
-    global _GDF_CACHE
-    cache_key = geojson_path
-    
-    if cache_key not in _GDF_CACHE:
-        _GDF_CACHE[cache_key] = load_wind_level_gdf(geojson_path)
-    
-    gdf = _GDF_CACHE[cache_key]
+    gdf = get_wind_level_gdf(geojson_path)
     
     point_level_info = query_point_level(lon, lat, gdf, distance_threshold_m)
-    distance_info = query_level_min_distance(lon, lat, gdf, radius_km, decimal_places)
+    contained_level = point_level_info['level'] if point_level_info['in_polygon'] else None
+    
+    if contained_level_only and contained_level is not None:
+        distance_info = [{"level": int(contained_level), "distance_km": 0.0, "bearing_deg": None}]
+    else:
+        distance_info = query_level_min_distance(
+            lon, lat, gdf, radius_km, decimal_places,
+            known_contained_level=contained_level
+        )
     
     return {
         "query_point": {"lon": lon, "lat": lat},
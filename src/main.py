@@ -9,9 +9,10 @@ import json
 import yaml
 import argparse
 from pathlib import Path
-from typing import Optional, Dict
+import numpy as np
+from typing import Optional, Dict, List, Sequence, Union
 
-from .geo_query import query_wind_level_info
+from .geo_query import query_wind_level_info, query_points_level, get_wind_level_gdf
 from .visualize import plot_wind_level_map
 from .utils import convert_lon_to_360
 
@@ -37,9 +38,33 @@ def load_config(config_path: Optional[str] = None) -> Dict:
     return config
 
 
+def _prepare_batch_points(lon, lat):
+    """
+    将批量查询的经纬度广播为等长的一维 float64 数组
+    
+    Args:
+        lon: 经度，标量或序列
+        lat: 纬度，标量或序列
+        
+    Returns:
+        (lon, lat) 一维数组
+    """
+    try:
+        lon, lat = np.broadcast_arrays(np.asarray(lon, dtype=float), np.asarray(lat, dtype=float))
+    except ValueError:
+        raise ValueError(
+            f"lon 与 lat 的形状不匹配: {np.shape(lon)} 与 {np.shape(lat)}"
+        ) from None
+    if lon.ndim != 1:
+        raise ValueError(f"批量查询的 lon/lat 须为一维序列，实际形状为 {lon.shape}")
+    if not (np.isfinite(lon).all() and np.isfinite(lat).all()):
+        raise ValueError("批量查询的 lon/lat 含有 NaN 或无穷值")
+    return lon, lat
+
+
 def query_wind_level(
-    lon: float,
-    lat: float,
+    lon: Union[float, Sequence[float], np.ndarray],
+    lat: Union[float, Sequence[float], np.ndarray],
     geojson_path: Optional[str] = None,
     radius_km: Optional[float] = None,
     config_path: Optional[str] = None,
@@ -47,14 +72,20 @@ def query_wind_level(
     output_path: Optional[str] = None,
     plot: bool = False,
     plot_output: Optional[str] = None
-) -> Dict:
+) -> Union[Dict, List[Dict]]:
     """
     查询风浪等级（Python API 接口）
     
+    lon/lat 任一为序列时执行批量查询，只返回各点当前所在等级（不计算距离、不保存、不绘图）。
+    lon 与 lat 按 NumPy 规则广播（如序列经度配单个纬度），广播后须为一维；批量查询时传入
+    radius_km、save_output=True、output_path、plot=True 或 plot_output 会抛出 ValueError，
+    配置中的 save_results 与 contained_level_only 不参与批量查询
+    
     Args:
-        lon: 经度（支持 -180~180 或 0~360，内部统一转换为 0~360）
-        lat: 纬度
-        geojson_path: GeoJSON 文件路径，若不指定则从配置读取
+        lon: 经度（支持 -180~180 或 0~360，内部统一转换为 0~360）；单个数值，
+             或批量查询时的序列 / NumPy 数组（与 lat 广播）
+        lat: 纬度；单个数值，或批量查询时的序列 / NumPy 数组（与 lon 广播）
+        geojson_path: 数据文件路径（.geojson 或 .parquet），若不指定则从配置读取
         radius_km: 搜索半径（千米），若不指定则从配置读取
         config_path: 配置文件路径
         save_output: 是否保存结果，若不指定则从配置读取
@@ -63,8 +94,30 @@ def query_wind_level(
         plot_output: 地图输出路径，若不指定则自动生成
         
     Returns:
-        查询结果字典（经度为 0~360 模式）
+        查询结果字典（经度为 0~360 模式）；批量查询时为列表：
+        [{"query_point": {"lon": float, "lat": float},
+          "current_level": {"in_polygon": bool, "level": int or None}}, ...]
+        
+    Raises:
+        ValueError: 批量查询时 lon/lat 无法广播为一维数组、含非有限值，或传入了批量查询不支持的参数
     """
+    batch = np.ndim(lon) > 0 or np.ndim(lat) > 0
+    
+    # 批量查询先校验输入
+    if batch:
+        lon, lat = _prepare_batch_points(lon, lat)
+        unsupported = [
+            name for name, given in (
+                ('radius_km', radius_km is not None),
+                ('save_output', bool(save_output)),
+                ('output_path', output_path is not None),
+                ('plot', plot),
+                ('plot_output', plot_output is not None),
+            ) if given
+        ]
+        if unsupported:
+            raise ValueError(f"批量查询不支持参数: {', '.join(unsupported)}")
+    
     # 将经度转换为 0-360 模式
     lon = convert_lon_to_360(lon)
     
@@ -81,6 +134,22 @@ def query_wind_level(
     
     distance_threshold_m = config['query'].get('distance_threshold_m', 1.0)
     decimal_places = config['output'].get('decimal_places', 3)
+    contained_level_only = config['query'].get('contained_level_only', False)
+    
+    # 批量查询：一次空间索引查询得到所有点的等级
+    if batch:
+        gdf = get_wind_level_gdf(str(geojson_path))
+        levels = query_points_level(lon, lat, gdf, distance_threshold_m)
+        return [
+            {
+                "query_point": {"lon": float(x), "lat": float(y)},
+                "current_level": {
+                    "in_polygon": bool(level >= 0),
+                    "level": int(level) if level >= 0 else None
+                }
+            }
+            for x, y, level in zip(lon, lat, levels)
+        ]
     
     # 执行查询
     result = query_wind_level_info(
@@ -89,7 +158,8 @@ def query_wind_level(
         geojson_path=str(geojson_path),
         radius_km=radius_km,
         distance_threshold_m=distance_threshold_m,
-        decimal_places=decimal_places
+        decimal_places=decimal_places,
+        contained_level_only=contained_level_only
     )
     
     # 保存结果
@@ -116,7 +186,7 @@ def query_wind_level(
         plot_config = config.get('plot', {})
         plot_wind_level_map(
             query_result=result,
-            geojson_path=str(geojson_path),
+            gdf=get_wind_level_gdf(str(geojson_path)),
             output_path=str(plot_output),
             figure_size=tuple(plot_config.get('figure_size', [12, 10])),
             dpi=plot_config.get('dpi', 150),
@@ -151,7 +221,7 @@ def main():
     
     parser.add_argument('--lon', type=float, required=True, help='查询点经度（支持 -180~180 或 0~360）')
     parser.add_argument('--lat', type=float, required=True, help='查询点纬度')
-    parser.add_argument('--geojson', type=str, help='GeoJSON 文件路径（可选）')
+    parser.add_argument('--geojson', type=str, help='数据文件路径，支持 .geojson 或 .parquet（可选）')
     parser.add_argument('--radius', type=float, help='搜索半径（千米，可选）')
     parser.add_argument('--config', type=str, help='配置文件路径（可选）')
     parser.add_argument('--output', type=str, help='输出文件路径（可选）')
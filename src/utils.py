@@ -1,10 +1,35 @@
 """
 工具函数模块
-包含经度转换、几何修复、GeoJSON加载等基础功能
+包含经度转换、几何修复、数据加载（GeoJSON / Parquet）等基础功能
 """
 
+import os
+import pickle
+import tempfile
+import weakref
+import numpy as np
+import pandas as pd
+import shapely
 import geopandas as gpd
 from pyproj import CRS
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+# 各 gdf 的预计算结果（如属性字典列表），按 id(gdf) 保存，只对计算它的 gdf 有效。
+# 不放在 gdf.attrs 中：attrs 会随 to_parquet 等一起序列化，也会在切片/拷贝时深拷贝给新对象。
+# gdf 被回收时自动删除对应条目
+_FRAME_CACHES: Dict[int, Dict] = {}
+
+
+def _frame_cache(gdf: gpd.GeoDataFrame) -> Dict:
+    """获取 gdf 的预计算缓存（不存在则创建）"""
+    key = id(gdf)
+    cache = _FRAME_CACHES.get(key)
+    if cache is None:
+        cache = _FRAME_CACHES[key] = {}
+        weakref.finalize(gdf, _FRAME_CACHES.pop, key, None)
+    return cache
 
 
 def convert_lon_to_360(lon: float) -> float:
@@ -12,14 +37,16 @@ def convert_lon_to_360(lon: float) -> float:
     将经度转换为 0-360 度模式
     
     Args:
-        lon: 经度值（支持 -180~180 或 0~360）
+        lon: 经度值（支持 -180~180、0~360 或任意范围），也可为 numpy 数组
         
     Returns:
-        0-360 范围的经度值
+        [0, 360) 范围的经度值
     """
-    if lon < 0:
-        return lon + 360
-    return lon
+    lon = lon % 360.0
+    # 绝对值极小的负数取模后会舍入为 360.0，归为 0.0 保证结果落在 [0, 360)
+    if np.ndim(lon) == 0:
+        return 0.0 if lon >= 360.0 else lon
+    return np.where(lon >= 360.0, 0.0, lon)
 
 
 def fix_invalid_geometry(geometry):
@@ -35,26 +62,66 @@ def fix_invalid_geometry(geometry):
     if geometry is None:
         return geometry
     if not geometry.is_valid:
-        return geometry.buffer(0)
+        return shapely.make_valid(geometry)
     return geometry
 
 
-def load_wind_level_gdf(data_path: str) -> gpd.GeoDataFrame:
+def fix_invalid_geometry_array(geoms: np.ndarray) -> np.ndarray:
     """
-    加载风浪等级数据文件（支持 GeoJSON 和 Parquet 格式）
+    批量修复几何体数组中的无效几何体（向量化）
+    
+    仅对无效的几何体调用 shapely.make_valid，有效几何体保持不变
     
     Args:
-        data_path: 数据文件路径（.geojson 或 .parquet）
+        geoms: Shapely 几何对象数组
         
     Returns:
-        GeoDataFrame，CRS 为 EPSG:4326，经度保持 0-360
+        修复后的几何对象数组（无需修复时返回输入本身）
     """
-    # 根据文件后缀选择加载方式
-    if data_path.endswith('.parquet'):
-        gdf = gpd.read_parquet(data_path)
-    else:
-        gdf = gpd.read_file(data_path)
+    invalid = ~shapely.is_valid(geoms)
+    if invalid.any():
+        geoms = geoms.copy()
+        geoms[invalid] = shapely.make_valid(geoms[invalid])
+    return geoms
+
+
+def fix_invalid_geometries(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """
+    批量修复 GeoDataFrame 中的无效几何体（向量化，原地修改）
+    
+    Args:
+        gdf: GeoDataFrame
+        
+    Returns:
+        修复后的 GeoDataFrame（与输入为同一对象）
+    """
+    geoms = np.asarray(gdf.geometry.values)
+    fixed = fix_invalid_geometry_array(geoms)
+    if fixed is not geoms:
+        gdf[gdf.geometry.name] = gpd.GeoSeries(fixed, index=gdf.index, crs=gdf.crs)
+    return gdf
+
+
+def get_property_records(gdf: gpd.GeoDataFrame) -> List[Dict]:
+    """
+    获取每行的属性字典（不含 geometry，值均为 Python 原生类型）
+    
+    首次调用时整表转换一次，结果缓存在该 gdf 的预计算缓存中，查询时按行号直接取用
     
+    Args:
+        gdf: 风浪等级 GeoDataFrame
+        
+    Returns:
+        与 gdf 行顺序一致的属性字典列表
+    """
+    cache = _frame_cache(gdf)
+    if 'property_records' not in cache:
+        cache['property_records'] = gdf.drop(columns=gdf.geometry.name).to_dict('records')
+    return cache['property_records']
+
+
+def _prepare_gdf(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """统一 CRS 为 EPSG:4326 并修复无效几何体"""
     # 确保 CRS 是 EPSG:4326
     if gdf.crs is None:
         gdf.set_crs("EPSG:4326", inplace=True)
@@ -62,9 +129,151 @@ def load_wind_level_gdf(data_path: str) -> gpd.GeoDataFrame:
         gdf = gdf.to_crs("EPSG:4326")
     
     # 修复无效几何体
-    gdf['geometry'] = gdf['geometry'].apply(fix_invalid_geometry)
+    return fix_invalid_geometries(gdf)
+
+
+# 预处理缓存格式版本：预计算内容变化时递增，旧的 .preproc.pkl 会被忽略并重建
+_PREPROC_VERSION = 7
+
+
+def _level_as_int8(levels: pd.Series) -> pd.Series:
+    """
+    将 level 列转为 int8 类型，内存占用为 int64 的 1/8
+    
+    仅当所有值都是 int8 范围内的整数时才转换，含缺失值、小数或超出范围时保持原样，
+    避免 astype 静默回绕
+    """
+    values = levels.to_numpy()
+    if not np.issubdtype(values.dtype, np.number) or levels.isna().any():
+        return levels
+    info = np.iinfo(np.int8)
+    if (values.min() < info.min or values.max() > info.max
+            or not np.array_equal(values, np.round(values))):
+        return levels
+    return levels.astype('int8')
+
+
+# 进程的 umask：os.umask 只能先设置再恢复，导入时读取一次，避免写缓存时与其他线程竞争
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _write_atomic(path: Path, write: Callable[[str], None]) -> None:
+    """
+    原子写入缓存文件：先写入同目录的临时文件，写完后再替换目标文件
+    
+    进程中途退出或多个进程同时写入时，读取方只会看到完整的旧文件或新文件。
+    mkstemp 创建的临时文件权限为 0600，替换前按 umask 恢复为普通新建文件的权限，
+    共享数据目录中其他用户的进程仍可读取缓存
+    
+    Args:
+        path: 目标文件路径
+        write: 将内容写入给定路径的函数（参数为临时文件路径）
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp)
+        os.chmod(tmp, 0o666 & ~_UMASK)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _read_wind_level_gdf(source: Path) -> gpd.GeoDataFrame:
+    """
+    读取数据文件并统一 CRS、修复几何
+    
+    非 Parquet 数据首次读取后，会在同目录写入预处理后的 .cached.parquet 缓存文件，
+    源文件未更新时后续读取直接使用缓存；缓存无法读取（如文件损坏）时重新读取源文件并重建
+    """
+    cache_path = source.with_suffix('.cached.parquet')
+    
+    # 根据文件后缀选择加载方式
+    if source.suffix == '.parquet':
+        return _prepare_gdf(gpd.read_parquet(source))
+    if cache_path.exists() and cache_path.stat().st_mtime >= source.stat().st_mtime:
+        try:
+            return gpd.read_parquet(cache_path)
+        except Exception as e:
+            print(f"Warning: Failed to read cache {cache_path}: {e}")
+    
+    gdf = _prepare_gdf(gpd.read_file(source, engine='pyogrio', use_arrow=True))
+    try:
+        _write_atomic(cache_path, gdf.to_parquet)
+    except OSError as e:
+        print(f"Warning: Failed to write cache {cache_path}: {e}")
+    return gdf
+
+
+def _read_preproc_sidecar(sidecar: Path, source: Path) -> Optional[gpd.GeoDataFrame]:
+    """
+    读取预处理缓存（.preproc.pkl），不存在、已过期、版本不符或无法读取时返回 None
+    
+    文件中先保存格式版本、再保存 (gdf, 预计算结果)，版本不符时不反序列化数据部分
+    """
+    if not sidecar.exists() or sidecar.stat().st_mtime < source.stat().st_mtime:
+        return None
+    try:
+        with open(sidecar, 'rb') as f:
+            if pickle.load(f) != _PREPROC_VERSION:
+                return None
+            gdf, precomputed = pickle.load(f)
+    except Exception as e:
+        print(f"Warning: Failed to read cache {sidecar}: {e}")
+        return None
+    _frame_cache(gdf).update(precomputed)
+    return gdf
+
+
+def _write_preproc_sidecar(sidecar: Path, gdf: gpd.GeoDataFrame) -> None:
+    """写入预处理缓存（.preproc.pkl），通过临时文件原子替换，并发冷启动时不会留下写了一半的文件"""
+    def _dump(path: str) -> None:
+        # protocol 5 下几何体和数组按连续字节序列化，读取很快
+        with open(path, 'wb') as f:
+            pickle.dump(_PREPROC_VERSION, f)
+            pickle.dump((gdf, _frame_cache(gdf)), f, protocol=5)
+    
+    try:
+        _write_atomic(sidecar, _dump)
+    except OSError as e:
+        print(f"Warning: Failed to write cache {sidecar}: {e}")
+
+
+def load_wind_level_gdf(data_path: str) -> gpd.GeoDataFrame:
+    """
+    加载风浪等级数据文件（支持 GeoJSON 和 Parquet 格式）
+    
+    首次加载完成预计算（属性转换）后，
+    会在同目录写入 .preproc.pkl 预处理缓存；源文件未更新时，新进程直接读取缓存，
+    不再重复读取和预计算
+    
+    缓存通过 pickle 读取，反序列化时可以执行任意代码：数据目录必须可信，
+    不要让不可信的用户或进程写入该目录
+    
+    Args:
+        data_path: 数据文件路径（.geojson 或 .parquet）
+        
+    Returns:
+        GeoDataFrame，CRS 为 EPSG:4326，经度保持 0-360
+    """
+    source = Path(data_path)
+    sidecar = source.with_suffix('.preproc.pkl')
+    
+    gdf = _read_preproc_sidecar(sidecar, source)
+    if gdf is None:
+        gdf = _read_wind_level_gdf(source)
+        gdf['level'] = _level_as_int8(gdf['level'])
+        
+        # 预先转换属性为 Python 原生类型（查询结果直接使用）
+        get_property_records(gdf)
+        
+        _write_preproc_sidecar(sidecar, gdf)
     
-    # 强制创建空间索引（加速查询）
+    # 空间索引和 prepare 状态不随 pickle 保存，每次加载时重新创建（耗时很短）
+    # 强制创建空间索引，并预处理（prepare）多边形，加速重复的相交/距离判断
     _ = gdf.sindex
+    shapely.prepare(np.asarray(gdf.geometry.values))
     
     return gdf
@@ -4,59 +4,57 @@
 """
 
 import os
-import math
-import random
+import threading
+from math import cos, radians
 from typing import Dict, Optional, Tuple, List
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib import rcParams
+import numpy as np
+import shapely
 import geopandas as gpd
+from shapely.geometry import box
 
-from .utils import load_wind_level_gdf
+from .geo_query import get_wind_level_gdf
 
+# matplotlib 导入开销较大，只在真正绘图时导入，仅做查询时不加载
 
-# 设置中文字体支持
-rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
-rcParams['axes.unicode_minus'] = False
+# 是否已设置 matplotlib 全局参数（中文字体等），只在首次绘图时设置一次
+_RCPARAMS_SET = False
 
+# 标题和坐标轴标签的字体（首次绘图时创建并解析字体文件，之后各次绘图复用）
+_TITLE_FONT = None
+_LABEL_FONT = None
 
-def _get_level_colors() -> Dict[int, str]:
-    """
-    获取风浪等级颜色映射
-    
-    Returns:
-        等级到颜色的映射字典
-    """
-    return {
-        4: '#A6CEE3',  # 轻浪 - 浅蓝
-        5: '#FFFF99',  # 中浪 - 黄色
-        6: '#FDB462',  # 大浪 - 橙色
-        7: '#E31A1C',  # 巨浪 - 红色
-        8: '#B22222',  # 狂浪 - 深红
-        9: '#6A3D9A',  # 狂涛 - 紫色
-    }
+# 复用的图形和坐标轴（批量绘图时不再每次新建图形、分配渲染缓冲区），通过 close_plot_pool() 释放
+# 进程内只有一个图形，绘图设计为单线程使用；多线程同时调用时由 _FIG_LOCK 串行执行，避免互相覆盖
+_FIG = None
+_AX = None
+_FIG_LOCK = threading.RLock()
 
 
-def _get_level_names() -> Dict[int, str]:
-    """
-    获取风浪等级中文名称
-    
-    Returns:
-        等级到名称的映射字典
-    """
-    return {
-        4: '轻浪',
-        5: '中浪',
-        6: '大浪',
-        7: '巨浪',
-        8: '狂浪',
-        9: '狂涛',
-    }
+# 风浪等级颜色映射
+_LEVEL_COLORS = {
+    4: '#A6CEE3',  # 轻浪 - 浅蓝
+    5: '#FFFF99',  # 中浪 - 黄色
+    6: '#FDB462',  # 大浪 - 橙色
+    7: '#E31A1C',  # 巨浪 - 红色
+    8: '#B22222',  # 狂浪 - 深红
+    9: '#6A3D9A',  # 狂涛 - 紫色
+}
+
+# 风浪等级中文名称
+_LEVEL_NAMES = {
+    4: '轻浪',
+    5: '中浪',
+    6: '大浪',
+    7: '巨浪',
+    8: '狂浪',
+    9: '狂涛',
+}
 
 
 def _calculate_plot_extent(
     lon: float,
     lat: float,
+    cos_lat_val: float,
     max_distance_km: float,
     buffer_ratio: float = 0.2
 ) -> Tuple[float, float, float, float]:
@@ -66,6 +64,7 @@ def _calculate_plot_extent(
     Args:
         lon: 查询点经度
         lat: 查询点纬度
+        cos_lat_val: 查询点纬度的余弦值（用于经度距离校正）
         max_distance_km: 最远距离（千米）
         buffer_ratio: 缓冲比例，默认0.2（在最远距离基础上增加20%）
         
@@ -81,7 +80,7 @@ def _calculate_plot_extent(
     
     # 粗略转换：1度纬度约111km，经度根据纬度调整
     lat_range = radius_km / 111.0
-    lon_range = radius_km / (111.0 * abs(cos_lat(lat)))
+    lon_range = radius_km / (111.0 * cos_lat_val)
     
     return (
         lon - lon_range,
@@ -91,44 +90,94 @@ def _calculate_plot_extent(
     )
 
 
-def cos_lat(lat: float) -> float:
-    """计算纬度的余弦值（用于经度距离校正）"""
-    return math.cos(math.radians(lat))
+def _generate_random_colors(n: int) -> List[str]:
+    """
+    生成 n 个随机且区分度高的颜色（HSV 转 RGB 全部向量化计算）
+    """
+    rng = np.random.default_rng(42)  # 固定种子以保证可重复性
+    hue = (np.arange(n) / max(n, 1) + rng.uniform(-0.05, 0.05, n)) % 1.0
+    saturation = rng.uniform(0.6, 0.9, n)
+    value = rng.uniform(0.7, 0.95, n)
+    
+    # HSV to RGB：按色相所在的六分区 h_i 选择各通道取值
+    h6 = hue * 6
+    h_i = h6.astype(np.int64) % 6
+    f = h6 - np.floor(h6)
+    p = value * (1 - saturation)
+    q = value * (1 - f * saturation)
+    t = value * (1 - (1 - f) * saturation)
+    r = np.choose(h_i, [value, q, p, p, t, value])
+    g = np.choose(h_i, [t, value, value, q, p, p])
+    b = np.choose(h_i, [p, p, t, value, value, q])
+    
+    rgb = (np.stack([r, g, b], axis=-1) * 255).astype(np.uint8)
+    return [f'#{r:02x}{g:02x}{b:02x}' for r, g, b in rgb]
+
+
+def _setup_rcparams() -> None:
+    """设置中文字体支持等全局参数，并创建标题/标签字体（首次绘图时执行一次）"""
+    global _RCPARAMS_SET, _TITLE_FONT, _LABEL_FONT
+    if _RCPARAMS_SET:
+        return
+    from matplotlib import rcParams, font_manager
+    rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
+    rcParams['axes.unicode_minus'] = False
+    # 长路径分块渲染，降低 Agg 后端的峰值内存
+    rcParams['agg.path.chunksize'] = 10000
+    
+    # 预先解析字体文件，之后绘制时直接命中字体查找缓存
+    _TITLE_FONT = font_manager.FontProperties(family=['SimHei', 'DejaVu Sans'], size=14, weight='bold')
+    _LABEL_FONT = font_manager.FontProperties(family=['SimHei', 'DejaVu Sans'], size=12)
+    font_manager.findfont(_TITLE_FONT)
+    font_manager.findfont(_LABEL_FONT)
+    _RCPARAMS_SET = True
 
 
-def _generate_random_colors(n: int) -> List[str]:
+def _polygon_paths(geoms: np.ndarray) -> List:
     """
-    生成 n 个随机且区分度高的颜色
+    将多边形数组转换为 matplotlib Path 列表（每个几何一个复合路径，内环为孔洞）
+    
+    先拆成单个 Polygon（make_valid 修复后可能得到含线、点的 GeometryCollection，
+    只保留其中的面），再通过 shapely.to_ragged_array 一次取出全部坐标和偏移量，
+    向量化生成路径指令，不再逐个多边形、逐个环转换
+    
+    Args:
+        geoms: Polygon / MultiPolygon / GeometryCollection 数组
+        
+    Returns:
+        与输入顺序一致的 Path 列表（不含面的几何为空路径）
     """
-    random.seed(42)  # 固定种子以保证可重复性
-    colors = []
-    for i in range(n):
-        hue = (i / n + random.uniform(-0.05, 0.05)) % 1.0
-        saturation = random.uniform(0.6, 0.9)
-        value = random.uniform(0.7, 0.95)
-        # HSV to RGB
-        h_i = int(hue * 6)
-        f = hue * 6 - h_i
-        p = value * (1 - saturation)
-        q = value * (1 - f * saturation)
-        t = value * (1 - (1 - f) * saturation)
-        if h_i == 0: r, g, b = value, t, p
-        elif h_i == 1: r, g, b = q, value, p
-        elif h_i == 2: r, g, b = p, value, t
-        elif h_i == 3: r, g, b = p, q, value
-        elif h_i == 4: r, g, b = t, p, value
-        else: r, g, b = value, p, q
-        colors.append(f'#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}')
-    return colors
+    from matplotlib.path import Path
+    
+    parts, rows = shapely.get_parts(geoms, return_index=True)
+    is_polygon = shapely.get_type_id(parts) == shapely.GeometryType.POLYGON
+    parts, rows = parts[is_polygon], rows[is_polygon]
+    if len(parts) == 0:
+        return [Path(np.zeros((0, 2))) for _ in range(len(geoms))]
+    
+    _, coords, (ring_offsets, part_ring_offsets) = shapely.to_ragged_array(parts)
+    
+    # 每个环的首点为 MOVETO、末点（与首点重合）为 CLOSEPOLY，其余为 LINETO
+    codes = np.full(len(coords), Path.LINETO, dtype=Path.code_type)
+    codes[ring_offsets[:-1]] = Path.MOVETO
+    codes[ring_offsets[1:] - 1] = Path.CLOSEPOLY
+    
+    # 同一几何拆出的多边形相邻，换算为每个几何的顶点起止位置
+    geom_part_offsets = np.searchsorted(rows, np.arange(len(geoms) + 1))
+    vertex_offsets = ring_offsets[part_ring_offsets[geom_part_offsets]]
+    return [
+        Path(coords[start:end], codes[start:end])
+        for start, end in zip(vertex_offsets[:-1], vertex_offsets[1:])
+    ]
 
 
 def _draw_bearing_arrows(
     ax,
     lon: float,
     lat: float,
+    cos_lat_val: float,
     level_distances: List[Dict],
-    max_distance: float,
-    level_names: Dict[int, str]
+    max_distance: float
 ) -> List:
     """
     绘制从查询点指向各等级最近位置的方位角箭头
@@ -136,13 +185,16 @@ def _draw_bearing_arrows(
     Args:
         ax: matplotlib axes
         lon, lat: 查询点坐标
+        cos_lat_val: 查询点纬度的余弦值（用于经度距离校正）
         level_distances: 各等级距离和方位角信息
         max_distance: 最远距离（用于计算箭头长度）
-        level_names: 等级名称映射
         
     Returns:
         箭头图例元素列表
     """
+    import matplotlib.patches as mpatches
+    import matplotlib.patheffects as path_effects
+    
     # 过滤出有方位角的等级（distance > 0）
     arrows_data = [(d['level'], d['distance_km'], d['bearing_deg']) 
                    for d in level_distances if d.get('bearing_deg') is not None]
@@ -156,77 +208,121 @@ def _draw_bearing_arrows(
     # 箭头长度为最远距离的 15%（地图坐标）
     arrow_len_km = max(max_distance * 0.15, 30)  # 至少30km
     arrow_len_lat = arrow_len_km / 111.0
-    arrow_len_lon = arrow_len_km / (111.0 * abs(cos_lat(lat)))
+    arrow_len_lon = arrow_len_km / (111.0 * cos_lat_val)
+    
+    # bearing_deg: 0=北, 90=东, 180=南, 270=西
+    # 转换为数学角度：北=90°, 东=0°，一次计算所有箭头的终点偏移（考虑经纬度比例）
+    angle_rad = np.radians(90 - np.array([bearing_deg for _, _, bearing_deg in arrows_data]))
+    dx = arrow_len_lon * np.cos(angle_rad)
+    dy = arrow_len_lat * np.sin(angle_rad)
+    
+    # 一次绘制所有箭头（箭头向量直接使用地图坐标）
+    ax.quiver(
+        np.full(len(dx), lon), np.full(len(dy), lat), dx, dy,
+        color=colors,
+        angles='xy',
+        scale_units='xy',
+        scale=1,
+        width=0.004,
+        zorder=9
+    )
     
-    legend_elements = []
+    # 一次生成所有标注文字和标注位置（箭头终点外侧）
+    labels = [f'L{level}\n{dist_km:.0f}km\n{bearing_deg:.0f}°' for level, dist_km, bearing_deg in arrows_data]
+    xs = lon + dx * 1.15
+    ys = lat + dy * 1.15
+    # 白色描边保证文字在彩色区域上清晰，比为每个标签绘制背景框开销小
+    stroke = [path_effects.withStroke(linewidth=3, foreground='white')]
     
-    for i, (level, dist_km, bearing_deg) in enumerate(arrows_data):
-        color = colors[i]
-        
-        # bearing_deg: 0=北, 90=东, 180=南, 270=西
-        # 转换为数学角度：北=90°, 东=0°
-        angle_rad = math.radians(90 - bearing_deg)
-        
-        # 计算箭头终点（考虑经纬度比例）
-        dx = arrow_len_lon * math.cos(angle_rad)
-        dy = arrow_len_lat * math.sin(angle_rad)
-        
-        # 绘制箭头
-        ax.annotate(
-            '',
-            xy=(lon + dx, lat + dy),
-            xytext=(lon, lat),
-            arrowprops=dict(
-                arrowstyle='->,head_width=0.4,head_length=0.3',
-                color=color,
-                lw=2.5,
-                shrinkA=8,  # 从查询点缩进一点
-                shrinkB=0
-            ),
-            zorder=9
-        )
-        
-        # 在箭头终点标注等级和距离
-        label_text = f'L{level}\n{dist_km:.0f}km\n{bearing_deg:.0f}°'
+    # 在箭头终点标注等级和距离
+    for x, y, label_text, color in zip(xs, ys, labels, colors):
         ax.text(
-            lon + dx * 1.15, lat + dy * 1.15,
+            x, y,
             label_text,
             fontsize=8,
             color=color,
             fontweight='bold',
             ha='center',
             va='center',
-            bbox=dict(boxstyle='round,pad=0.2', facecolor='white', alpha=0.7, edgecolor=color)
-        )
-        
-        # 添加到图例
-        name = level_names.get(level, f'Level {level}')
-        legend_elements.append(
-            mpatches.FancyArrow(0, 0, 0.1, 0, width=0.02, color=color,
-                               label=f'→ L{level} {name}: {dist_km:.1f}km, {bearing_deg:.1f}°')
+            path_effects=stroke
         )
     
+    # 添加到图例
+    legend_elements = [
+        mpatches.FancyArrow(0, 0, 0.1, 0, width=0.02, color=color,
+                           label=f'→ L{level} {_LEVEL_NAMES.get(level, f"Level {level}")}: {dist_km:.1f}km, {bearing_deg:.1f}°')
+        for (level, dist_km, bearing_deg), color in zip(arrows_data, colors)
+    ]
+    
     return legend_elements
 
 
+def _get_pooled_axes(figure_size: Tuple[int, int], dpi: int):
+    """
+    获取复用的图形和坐标轴，尺寸或分辨率与上次不同时重新创建（调用方须持有 _FIG_LOCK）
+    
+    Args:
+        figure_size: 图片尺寸（宽, 高），单位英寸
+        dpi: 图片分辨率
+    
+    Returns:
+        (Figure, Axes)
+    """
+    global _FIG, _AX
+    import matplotlib.pyplot as plt
+    
+    if _FIG is not None and (
+        tuple(_FIG.get_size_inches()) != tuple(float(v) for v in figure_size)
+        or _FIG.dpi != dpi
+        or not plt.fignum_exists(_FIG.number)
+    ):
+        close_plot_pool()
+    
+    if _FIG is None:
+        # 创建图形（constrained 布局在绘制时计算，不再额外调用 tight_layout 做一次完整渲染）
+        _FIG, _AX = plt.subplots(figsize=figure_size, dpi=dpi, layout='constrained')
+        # 保存时不再裁剪空白（bbox_inches='tight'），由约束布局留出与之前相当的页边距
+        _FIG.get_layout_engine().set(w_pad=0.1, h_pad=0.1)
+    else:
+        # 清空图形后重建坐标轴（只清空坐标轴会保留上次约束布局计算出的位置），画布和渲染缓冲区继续复用
+        _FIG.clf()
+        _AX = _FIG.add_subplot()
+    return _FIG, _AX
+
+
+def close_plot_pool() -> None:
+    """释放复用的绘图图形（批量绘图结束后调用）"""
+    global _FIG, _AX
+    with _FIG_LOCK:
+        if _FIG is not None:
+            import matplotlib.pyplot as plt
+            plt.close(_FIG)
+        _FIG = None
+        _AX = None
+
+
 def plot_wind_level_map(
     query_result: Dict,
-    geojson_path: str,
+    geojson_path: Optional[str] = None,
     output_path: Optional[str] = None,
     figure_size: Tuple[int, int] = (12, 10),
     dpi: int = 150,
-    buffer_ratio: float = 0.2
+    buffer_ratio: float = 0.2,
+    gdf: Optional[gpd.GeoDataFrame] = None
 ) -> None:
     """
     绘制风浪等级地图（统一使用 0-360 度坐标系）
     
+    各次调用复用进程内同一个图形，设计为单线程使用；多线程同时调用时会加锁串行绘制
+    
     Args:
         query_result: 查询结果字典（来自 query_wind_level_info，经度为 0~360）
-        geojson_path: GeoJSON 文件路径
+        geojson_path: 数据文件路径（.geojson 或 .parquet），未传入 gdf 时使用
         output_path: 输出图片路径，如果为None则不保存
         figure_size: 图片尺寸（宽, 高），单位英寸
         dpi: 图片分辨率
         buffer_ratio: 地图范围缓冲比例
+        gdf: 可选，已加载的风浪等级数据（如查询时缓存的数据），传入后不再重复加载
     """
     # 提取查询点信息（已经是 0-360 模式）
     query_point = query_result['query_point']
@@ -237,36 +333,72 @@ def plot_wind_level_map(
     # 计算最远距离
     max_distance = max([d['distance_km'] for d in level_distances]) if level_distances else 50
     
-    # 加载 GeoJSON 数据（保持 0-360 坐标）
-    gdf = load_wind_level_gdf(geojson_path)
+    # 加载数据（保持 0-360 坐标），已传入时直接复用；
+    # 否则使用按 (路径, 修改时间) 缓存的数据，重复绘图不再重新读取文件和构建索引
+    if gdf is None:
+        gdf = get_wind_level_gdf(geojson_path)
+    
+    # 纬度余弦（经度距离校正）只计算一次，极点附近限制最小值避免除零
+    cos_lat_val = max(abs(cos(radians(lat))), 1e-6)
     
     # 计算绘图范围
     min_lon, max_lon, min_lat, max_lat = _calculate_plot_extent(
-        lon, lat, max_distance, buffer_ratio
+        lon, lat, cos_lat_val, max_distance, buffer_ratio
     )
     
     # 过滤在范围内的多边形（数据和查询点都在 0-360 坐标系，直接选择）
-    gdf_filtered = gdf.cx[min_lon:max_lon, min_lat:max_lat]
-    
-    # 创建图形
-    fig, ax = plt.subplots(figsize=figure_size, dpi=dpi)
-    
-    # 获取颜色和名称映射
-    level_colors = _get_level_colors()
-    level_names = _get_level_names()
-    
-    # 绘制不同等级的区域
-    for level in sorted(gdf_filtered['level'].unique()):
-        level_data = gdf_filtered[gdf_filtered['level'] == level]
-        color = level_colors.get(int(level), '#CCCCCC')
-        level_data.plot(
-            ax=ax,
-            color=color,
-            edgecolor='gray',
-            linewidth=0.5,
-            alpha=0.7,
-            label=f'Level {int(level)}'
+    # 直接使用空间索引查询与绘图范围相交的多边形，排序后保持原数据的绘制顺序
+    idx = np.sort(gdf.sindex.query(box(min_lon, min_lat, max_lon, max_lat), predicate='intersects'))
+    gdf_filtered = gdf.iloc[idx]
+    
+    # 数据加载和范围筛选不占用图形；复用的图形从获取到保存完成期间不能被其他线程清空或重建
+    with _FIG_LOCK:
+        _draw_wind_level_map(
+            gdf_filtered, lon, lat, current_level, level_distances, max_distance,
+            cos_lat_val, (min_lon, max_lon, min_lat, max_lat), output_path, figure_size, dpi
         )
+
+
+def _draw_wind_level_map(
+    gdf_filtered: gpd.GeoDataFrame,
+    lon: float,
+    lat: float,
+    current_level: Optional[int],
+    level_distances: List[Dict],
+    max_distance: float,
+    cos_lat_val: float,
+    extent: Tuple[float, float, float, float],
+    output_path: Optional[str],
+    figure_size: Tuple[int, int],
+    dpi: int
+) -> None:
+    """在复用的图形上绘制并保存地图（plot_wind_level_map 的绘制部分，调用方须持有 _FIG_LOCK）"""
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as mpatches
+    from matplotlib.collections import PathCollection
+    
+    _setup_rcparams()
+    
+    min_lon, max_lon, min_lat, max_lat = extent
+    
+    # 获取复用的图形（首次调用时创建），上次绘制的内容已清除
+    fig, ax = _get_pooled_axes(figure_size, dpi)
+    
+    # 绘制不同等级的区域：按 level 升序（稳定排序）一次绘制，高等级覆盖在低等级之上
+    levels = sorted(int(level) for level in gdf_filtered['level'].unique())
+    if levels:
+        ordered = gdf_filtered.sort_values('level', kind='stable')
+        # 每个等级只查一次颜色，再按各行等级在 levels 中的位置一次取出整列颜色
+        palette = np.array([_LEVEL_COLORS.get(level, '#CCCCCC') for level in levels])
+        facecolors = palette[np.searchsorted(levels, ordered['level'].to_numpy())]
+        ax.add_collection(PathCollection(
+            _polygon_paths(np.asarray(ordered.geometry.values)),
+            facecolors=facecolors,
+            edgecolors='gray',
+            linewidths=0.5,
+            alpha=0.7,
+            rasterized=True  # 矢量格式（pdf/svg）输出时多边形图层以位图嵌入，文字和箭头保持矢量
+        ))
     
     # 绘制查询点
     ax.plot(lon, lat, marker='*', color='red', markersize=20, 
@@ -279,7 +411,7 @@ def plot_wind_level_map(
     
     # 绘制方位角箭头（指向各等级最近位置的方向）
     arrow_legend = _draw_bearing_arrows(
-        ax, lon, lat, level_distances, max_distance, level_names
+        ax, lon, lat, cos_lat_val, level_distances, max_distance
     )
     
     # 设置地图范围
@@ -287,19 +419,18 @@ def plot_wind_level_map(
     ax.set_ylim(min_lat, max_lat)
     
     # 设置标签和网格
-    ax.set_xlabel('经度 (Longitude)', fontsize=12)
-    ax.set_ylabel('纬度 (Latitude)', fontsize=12)
+    ax.set_xlabel('经度 (Longitude)', fontproperties=_LABEL_FONT)
+    ax.set_ylabel('纬度 (Latitude)', fontproperties=_LABEL_FONT)
     ax.grid(True, linestyle='--', alpha=0.5)
     ax.set_aspect('equal')
     
     # 创建图例
     legend_elements = []
-    for level in sorted(gdf_filtered['level'].unique()):
-        level_int = int(level)
-        color = level_colors.get(level_int, '#CCCCCC')
-        name = level_names.get(level_int, f'Level {level_int}')
+    for level in levels:
+        color = _LEVEL_COLORS.get(level, '#CCCCCC')
+        name = _LEVEL_NAMES.get(level, f'Level {level}')
         legend_elements.append(
-            mpatches.Patch(color=color, label=f'Level {level_int} - {name}')
+            mpatches.Patch(color=color, label=f'Level {level} - {name}')
         )
     
     # 添加查询点图例
@@ -319,19 +450,15 @@ def plot_wind_level_map(
     title = f'风浪等级分布图\n查询点: ({lon:.4f}, {lat:.4f})'
     if current_level:
         title += f' | 当前等级: {current_level}'
-    ax.set_title(title, fontsize=14, fontweight='bold', pad=15)
-    
-    # 调整布局
-    plt.tight_layout()
+    ax.set_title(title, fontproperties=_TITLE_FONT, pad=15)
     
     # 保存或显示
     if output_path:
-        # 确保输出目录存在
+        # 确保输出目录存在（已存在时不报错，无需先单独判断）
         output_dir = os.path.dirname(output_path)
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
         
-        plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
+        # 图形会被复用，不再调用 plt.close()；直接保存该图形，不依赖 pyplot 的当前图形
+        fig.savefig(output_path, dpi=dpi)
         print(f"图片已保存至: {output_path}")
-    
-    plt.close()
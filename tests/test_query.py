@@ -4,18 +4,189 @@
 
 import json
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 # 添加项目根目录到 Python 路径
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+import geopandas as gpd
+from shapely.geometry import box
+
 from src.main import query_wind_level
+from src.geo_query import (
+    query_level_min_distance, query_point_level, query_points_level, get_wind_level_gdf
+)
+from src.utils import convert_lon_to_360
+
+try:
+    import orjson
+except ImportError:  # 可选依赖：未安装时使用标准库 json
+    orjson = None
+
+
+def _dumps(obj) -> bytes:
+    """
+    将结果序列化为缩进 2 格的 UTF-8 JSON（安装了 orjson 时使用 orjson）
+    
+    Args:
+        obj: 待序列化的对象
+        
+    Returns:
+        UTF-8 编码的 JSON 字节串
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _print_json(obj) -> None:
+    """以 JSON 格式输出到标准输出"""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(_dumps(obj) + b"\n")
+    sys.stdout.buffer.flush()
+
+
+@lru_cache(maxsize=64)
+def _query_cached(lon, lat, geojson_path, radius_km):
+    return query_wind_level(
+        lon=lon,
+        lat=lat,
+        geojson_path=geojson_path,
+        radius_km=radius_km,
+        save_output=False
+    )
+
+
+def cached_query(lon, lat, geojson_path, radius_km=None):
+    """
+    带缓存的查询：相同的 (经度, 纬度, 数据路径, 半径) 只查询一次
+    
+    只以不可变参数作为缓存键；save_output、plot 等有副作用的参数不经过缓存，
+    需要时直接调用 query_wind_level。返回的结果字典在多次调用间共享，不要修改。
+    
+    Args:
+        lon: 经度
+        lat: 纬度
+        geojson_path: 数据文件路径
+        radius_km: 搜索半径（千米），None 表示不限制
+        
+    Returns:
+        查询结果字典
+    """
+    if radius_km is not None:
+        radius_km = round(float(radius_km), 3)
+    return _query_cached(float(lon), float(lat), str(geojson_path), radius_km)
+
+
+# 距离回归检查的参考结果：(经度, 纬度, 半径km) -> [(等级, 距离km, 方位角), ...]
+# 取自逐个多边形投影后计算距离的原始实现（这些点上原实现的搜索范围足够，结果可靠）
+REFERENCE_DISTANCES = {
+    (199.473945, -4.0147083, 3000): [(4, 0.0, None), (5, 169.559, 24.697), (6, 2224.983, 0.386)],
+    (175.526055, -37.0147083, 700): [(4, 23.044, 23.236), (5, 23.044, 23.236), (6, 23.044, 23.236),
+                                     (7, 58.096, 32.813), (8, 177.057, 25.843)],
+    (218.237, 38.926, 700): [(4, 0.0, None), (5, 0.0, None), (6, 0.0, None), (7, 480.18, 287.028)],
+    (262.494, -49.289, 700): [(4, 282.387, 12.857), (5, 0.0, None), (6, 0.0, None), (7, 3.685, 180.719)],
+    (168.4566, 1.9765, 3000): [(4, 0.0, None), (5, 347.375, 359.978), (6, 1091.281, 202.855),
+                               (7, 1587.831, 183.266), (8, 2911.654, 180.021)],
+}
+
+
+def check_level_distances(geojson_path) -> bool:
+    """
+    检查各等级距离/方位角与参考结果一致（距离误差不超过 0.002km，方位角不超过 0.01°）
+    
+    Args:
+        geojson_path: 数据文件路径
+        
+    Returns:
+        全部一致时返回 True
+    """
+    ok = True
+    for (lon, lat, radius_km), expected in REFERENCE_DISTANCES.items():
+        result = cached_query(lon, lat, geojson_path, radius_km=radius_km)
+        actual = [(d["level"], d["distance_km"], d["bearing_deg"]) for d in result["level_distances"]]
+        
+        same = len(actual) == len(expected) and all(
+            level == exp_level
+            and abs(dist - exp_dist) <= 0.002
+            and (bearing is None) == (exp_bearing is None)
+            and (bearing is None or abs((bearing - exp_bearing + 180) % 360 - 180) <= 0.01)
+            for (level, dist, bearing), (exp_level, exp_dist, exp_bearing) in zip(actual, expected)
+        )
+        if not same:
+            ok = False
+            print(f"不一致: ({lon}, {lat}, {radius_km}km)\n  期望: {expected}\n  实际: {actual}")
+    return ok
+
+
+def _nan_level_gdf() -> gpd.GeoDataFrame:
+    """构造含缺失等级的小数据：三个相邻的 1°×1° 方块，等级为 4、5、缺失"""
+    return gpd.GeoDataFrame(
+        {"level": [4, 5, None]},
+        geometry=[box(0, 0, 1, 1), box(2, 0, 3, 1), box(4, 0, 5, 1)],
+        crs="EPSG:4326"
+    )
+
+
+def check_nan_levels() -> bool:
+    """
+    检查缺失等级的多边形被忽略：在缺失等级方块内查询，只返回等级 4、5 且都在西侧
+    
+    Returns:
+        结果符合预期时返回 True
+    """
+    results = query_level_min_distance(4.5, 0.5, _nan_level_gdf())
+    levels = [d["level"] for d in results]
+    ok = levels == [4, 5] and all(
+        d["distance_km"] > 0 and abs(d["bearing_deg"] - 270) < 1 for d in results
+    ) and results[1]["distance_km"] < results[0]["distance_km"]
+    if not ok:
+        print(f"缺失等级处理不符合预期: {results}")
+    return ok
+
+
+def check_batch_levels(geojson_path) -> bool:
+    """
+    检查批量查询与逐点 query_point_level 的等级一致，且形状不匹配的输入抛出 ValueError
+    
+    Args:
+        geojson_path: 数据文件路径
+        
+    Returns:
+        全部符合预期时返回 True
+    """
+    points = [(-160.5260550, -4.0147083)] + [(lon, lat) for lon, lat, _ in REFERENCE_DISTANCES]
+    lons = [lon for lon, _ in points]
+    lats = [lat for _, lat in points]
+    
+    gdf = get_wind_level_gdf(str(geojson_path))
+    expected = [query_point_level(convert_lon_to_360(lon), lat, gdf)["level"] for lon, lat in points]
+    actual = [r["current_level"]["level"] for r in query_wind_level(lon=lons, lat=lats, geojson_path=geojson_path)]
+    ok = actual == expected
+    if not ok:
+        print(f"批量查询与逐点查询不一致\n  逐点: {expected}\n  批量: {actual}")
+    
+    # 缺失等级的方块内的点视为不在任何等级区域内
+    nan_levels = query_points_level([4.5, 0.5, 2.5], [0.5, 0.5, 0.5], _nan_level_gdf()).tolist()
+    if nan_levels != [-1, 4, 5]:
+        ok = False
+        print(f"批量查询缺失等级处理不符合预期: {nan_levels}")
+    
+    try:
+        query_wind_level(lon=lons, lat=lats[:2], geojson_path=geojson_path)
+    except ValueError:
+        pass
+    else:
+        ok = False
+        print("形状不匹配的 lon/lat 未抛出 ValueError")
+    return ok
 
 
 if __name__ == "__main__":
     # 测试数据路径（使用相对路径）
-    geojson_path = project_root / "test_data" / "wind_level_18z.geojson"
+    geojson_path = project_root / "test_data" / "wind_level_18z.parquet"
     
     # 测试点（与原脚本相同）
     query_lon = -160.5260550
@@ -29,32 +200,42 @@ if __name__ == "__main__":
     # 测试1：不限制半径
     print("\n【测试1】不限制搜索半径")
     print("-" * 80)
-    result1 = query_wind_level(
-        lon=query_lon,
-        lat=query_lat,
-        geojson_path=str(geojson_path),
-        save_output=False
-    )
-    print(json.dumps(result1, ensure_ascii=False, indent=2))
+    result1 = cached_query(query_lon, query_lat, geojson_path)
+    _print_json(result1)
     
     # 测试2：限制半径 740km
     print("\n【测试2】限制搜索半径 740km")
     print("-" * 80)
-    result2 = query_wind_level(
-        lon=query_lon,
-        lat=query_lat,
-        geojson_path=str(geojson_path),
-        radius_km=740,
-        save_output=False
-    )
-    print(json.dumps(result2, ensure_ascii=False, indent=2))
+    result2 = cached_query(query_lon, query_lat, geojson_path, radius_km=740)
+    _print_json(result2)
+    
+    # 测试3：距离回归检查
+    print("\n【测试3】各等级距离回归检查")
+    print("-" * 80)
+    distances_ok = check_level_distances(geojson_path)
+    print("通过" if distances_ok else "失败")
+    
+    # 测试4：缺失等级的多边形
+    print("\n【测试4】缺失等级的多边形")
+    print("-" * 80)
+    nan_ok = check_nan_levels()
+    print("通过" if nan_ok else "失败")
+    
+    # 测试5：批量查询
+    print("\n【测试5】批量查询与逐点查询一致")
+    print("-" * 80)
+    batch_ok = check_batch_levels(geojson_path)
+    print("通过" if batch_ok else "失败")
     
     # 保存结果
     output_path = project_root / "query_result.json"
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump({
+    with open(output_path, "wb") as f:
+        f.write(_dumps({
             "test1_no_radius_limit": result1,
             "test2_radius_740km": result2
-        }, f, ensure_ascii=False, indent=2)
+        }))
     
     print(f"\n结果已保存至: {output_path}")
+    
+    if not (distances_ok and nan_ok and batch_ok):
+        sys.exit(1)